@@ -1,15 +1,53 @@
 # 2025-11-24T00:25:07.335723
+import argparse
+
 import vitis
 
+
+def run_csyn_only(comp):
+    """C synthesis only - fast path for algorithm iteration"""
+    comp.run(operation="SYNTHESIS")
+
+
+def run_cosim(comp):
+    """Synthesis followed by C/RTL co-simulation"""
+    comp.run(operation="SYNTHESIS")
+    comp.run(operation="COSIMULATION")
+
+
+def run_impl(comp):
+    """Synthesis followed by place-and-route"""
+    comp.run(operation="SYNTHESIS")
+    comp.run(operation="IMPLEMENTATION")
+
+
+def run_full(comp):
+    """Every stage, including place-and-route"""
+    comp.run(operation="C_SIMULATION")
+    comp.run(operation="SYNTHESIS")
+    comp.run(operation="COSIMULATION")
+    comp.run(operation="IMPLEMENTATION")
+
+
+# Entry point run for each --stage
+STAGES = {
+    "csyn": run_csyn_only,
+    "cosim": run_cosim,
+    "impl": run_impl,
+    "all": run_full,
+}
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--stage", choices=STAGES, default="impl",
+                    help="flow stage to run (default: impl)")
+args = parser.parse_args()
+
 client = vitis.create_client()
 client.set_workspace(path="hardware-hls")
 
 comp = client.create_hls_component(name = "hls_component",cfg_file = ["hls_config.cfg"],template = "empty_hls_component")
 
 comp = client.get_component(name="hls_component")
-comp.run(operation="SYNTHESIS")
-
-comp.run(operation="IMPLEMENTATION")
+STAGES[args.stage](comp)
 
 vitis.dispose()
-
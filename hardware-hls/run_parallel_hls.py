@@ -10,8 +10,26 @@ traffic pattern: uniform, diagonal, quasi-diagonal, and log-diagonal.
 Each flow runs in a separate background process with output redirected to
 pattern-specific log files.
 
+Successful runs are cached under .hls_cache/, keyed on a hash of the HLS
+tool binary's identity, the TCL script, hls_config.cfg and every file the
+script adds. Re-running an unchanged configuration restores its project
+directory and log from the cache instead of invoking HLS again. Entries
+are archived in the background; once the cache exceeds CACHE_MAX_BYTES
+the least recently used entries are evicted. Delete .hls_cache/ to clear
+it entirely.
+
 Usage:
-    python3 run_parallel_hls.py
+    python3 run_parallel_hls.py [--stage {csyn,cosim,impl,all}] [--no-affinity]
+
+--stage is forwarded to each TCL script via -tclargs. Use csyn for quick
+synthesis-only iterations; the default (cosim) runs synthesis and
+co-simulation.
+
+On Linux each pattern's launched processes are pinned to an equal share
+of the available CPUs (when there are at least as many CPUs as patterns)
+to cut cross-core migration. A pattern's standard and aggressive runs share
+one subset so the aggressive run's lower priority decides who gets it;
+--no-affinity leaves placement to the scheduler.
 
 The script will:
 1. Launch 4 parallel vitis_hls processes
@@ -20,11 +38,20 @@ The script will:
 4. Aggregate results from all patterns
 """
 
+import argparse
+import csv
 import subprocess
 import os
+import queue
+import threading
+import re
 import time
 import sys
-from datetime import datetime
+import shutil
+import hashlib
+import json
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Configuration
@@ -32,18 +59,248 @@ PATTERNS = ["uniform", "diagonal", "quasi_diagonal", "log_diagonal"]
 OPTIMIZATIONS = ["", "_aggressive"]  # Standard and aggressive optimization levels
 HLS_COMMAND = "vitis_hls"  # Adjust if needed (might be vivado_hls on older versions)
 WORKING_DIR = Path(__file__).parent.absolute()
+RESULTS_FILE = WORKING_DIR / "sw_qps_all_results.csv"  # Aggregated per-config CSVs
+RESULTS_ARCHIVE_DIR = WORKING_DIR / "results_per_config"  # Originals, one subdir per run
+STAGES = ["csyn", "cosim", "impl", "all"]  # Flow stages understood by the TCL scripts
+DEFAULT_STAGE = "cosim"
+CSV_STAGES = {"cosim", "all"}  # Stages that execute the testbench
+AGGRESSIVE_NICENESS = 10  # Nice increment for the non-critical aggressive variants
+# Cached `vitis_hls -version` probe results, shared across working trees
+ENV_CACHE_FILE = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "sw_qps" / "env.json"
+HEARTBEAT_INTERVAL = 30  # Seconds between "Running: ..." status lines
+CACHE_DIR = WORKING_DIR / ".hls_cache"
+CACHE_MAX_BYTES = 20 * 1024**3  # Least recently used entries are evicted beyond this
+HLS_CONFIG_FILE = WORKING_DIR / "hls_config.cfg"
+DEPCACHE_FILE = CACHE_DIR / "depcache.json"  # config -> stage and dependency mtimes
+
+# Pipelining/latency figures reported by vitis_hls, e.g. "Final II = 1".
+# These are emitted per loop/function, so only the most recent one is kept
+# and it is reported as such - it is not necessarily the top function's.
+LOG_METRIC_RE = re.compile(rb"\b(II|Latency)\s*=\s*([\w.]+)")
+
+# Matches uncommented `add_files [-tb] <path>` lines in the TCL scripts
+ADD_FILES_RE = re.compile(r"^\s*add_files\s+(?:-tb\s+)?(\S+)", re.MULTILINE)
+# Matches quoted (project-local) includes in C/C++ sources
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s+"([^"]+)"', re.MULTILINE)
+# Matches `set hls_src <dir>`, which add_files paths may reference
+HLS_SRC_RE = re.compile(r"^\s*set\s+hls_src\s+(.*?)\s*$", re.MULTILINE)
+
+
+def _scan_includes(path):
+    """Return existing files named by quoted #include lines, relative to path"""
+    try:
+        text = path.read_text(errors="replace")
+    except OSError:
+        return set()
+    includes = set()
+    for match in INCLUDE_RE.finditer(text):
+        header = Path(os.path.normpath(path.parent / match.group(1)))
+        if header.is_file() and WORKING_DIR in header.parents:
+            includes.add(header)
+    return includes
+
+
+def _scan_tcl_deps(tcl_path):
+    """Return the set of files a TCL script pulls in via add_files
+    
+    Quoted #include lines of those files are followed transitively, so
+    headers such as sw_qps_top.h count even though no add_files names them.
+    """
+    text = tcl_path.read_text(errors="replace")
+    hls_src = HLS_SRC_RE.search(text)
+    deps = set()
+    for match in ADD_FILES_RE.finditer(text):
+        path = match.group(1).strip('"')
+        if hls_src:
+            src_dir = hls_src.group(1).strip('"')
+            path = path.replace("${hls_src}", src_dir).replace("$hls_src", src_dir)
+        deps.add(WORKING_DIR / path)
+    
+    pending = list(deps)
+    while pending:
+        for header in _scan_includes(pending.pop()):
+            if header not in deps:
+                deps.add(header)
+                pending.append(header)
+    return deps
+
+
+def _config_deps(pattern, optimization=""):
+    """Return every file a config depends on, in a stable order"""
+    script = WORKING_DIR / f"run_sw_qps_{pattern}{optimization}.tcl"
+    deps = [script]
+    if HLS_CONFIG_FILE.exists():
+        deps.append(HLS_CONFIG_FILE)
+    deps.extend(sorted(_scan_tcl_deps(script)))
+    return deps
+
+
+def _dep_mtimes(deps):
+    """Map each dependency (relative to WORKING_DIR) to its mtime_ns"""
+    mtimes = {}
+    for dep in deps:
+        try:
+            mtimes[str(dep.relative_to(WORKING_DIR))] = dep.stat().st_mtime_ns
+        except OSError:
+            mtimes[str(dep.relative_to(WORKING_DIR))] = None
+    return mtimes
+
+
+def _load_depcache():
+    """Load the dependency cache written after successful runs"""
+    try:
+        with open(DEPCACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _hls_tool_identity():
+    """Identify the installed HLS_COMMAND by resolved path, inode and mtime
+    
+    Returns "" if the tool is not on PATH, so a later install still changes
+    every config hash.
+    """
+    path = shutil.which(HLS_COMMAND)
+    if path is None:
+        return ""
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    return f"{path}:{st.st_ino}:{st.st_mtime_ns}"
+
+
+def _config_hash(deps, stage=DEFAULT_STAGE, tool_id=""):
+    """Hash the HLS tool, flow stage and a config's deps (from _config_deps)"""
+    digest = hashlib.sha256(tool_id.encode() + b"\0" + stage.encode() + b"\0")
+    for dep in deps:
+        digest.update(str(dep.relative_to(WORKING_DIR)).encode())
+        digest.update(b"\0")
+        if dep.exists():
+            digest.update(dep.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class TailState:
+    """Incrementally reads a growing HLS log and extracts key metrics"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.pos = 0
+        self.partial = b""  # Trailing bytes of an unfinished line
+        self.metrics = {"errors": 0, "warnings": 0, "last_ii": None, "last_latency": None}
+        self._fd = None
+    
+    def update(self):
+        """Scan bytes written since the last call; return new ERROR lines"""
+        if self._fd is None:
+            try:
+                self._fd = os.open(self.path, os.O_RDONLY)
+            except FileNotFoundError:
+                return []
+        
+        size = os.fstat(self._fd).st_size
+        if size <= self.pos:
+            return []
+        chunk = self.partial + os.pread(self._fd, size - self.pos, self.pos)
+        self.pos = size
+        
+        *lines, self.partial = chunk.split(b"\n")
+        return self._scan(lines)
+    
+    def close(self):
+        """Read any remaining output and release the descriptor"""
+        errors = self.update()
+        if self.partial:
+            errors += self._scan([self.partial])
+            self.partial = b""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        return errors
+    
+    def _scan(self, lines):
+        """Update metrics from complete log lines; return the ERROR lines"""
+        errors = []
+        for line in lines:
+            if line.startswith(b"ERROR:"):
+                self.metrics["errors"] += 1
+                errors.append(line.decode(errors="replace").rstrip())
+            elif line.startswith(b"WARNING:"):
+                self.metrics["warnings"] += 1
+            for key, value in LOG_METRIC_RE.findall(line):
+                # Last match wins, e.g. "Final II" over "Target II"
+                self.metrics["last_ii" if key == b"II" else "last_latency"] = value.decode()
+        return errors
+
+
+def _drop_page_cache(path):
+    """Ask the kernel to evict a file's (clean) pages; best effort"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _results_csv(pattern, optimization):
+    """Per-config results CSV the testbench writes (via SW_QPS_RESULTS_CSV)"""
+    variant = "aggressive" if optimization else "standard"
+    return WORKING_DIR / f"sw_qps_{pattern}_{variant}_results.csv"
+
+
+def _cache_outputs(pattern, optimization):
+    """Return the (project dir, log file) produced by a config
+    
+    The results CSV is deliberately not cached: its rows were aggregated
+    into RESULTS_FILE when the config actually ran, so restoring it on a
+    cache hit would only aggregate them again.
+    """
+    config_name = f"{pattern}{optimization}"
+    return (WORKING_DIR / f"sw_qps_project_{config_name}",
+            WORKING_DIR / f"hls_{config_name}.log")
+
 
 class HLSRunner:
     """Manages parallel execution of HLS flows"""
     
-    def __init__(self):
+    def __init__(self, stage=DEFAULT_STAGE, affinity=True):
+        self.stage = stage
+        self.affinity = affinity and hasattr(os, "sched_setaffinity")
+        self.depcache = _load_depcache()
+        try:
+            # A different HLS tool version yields different projects
+            self.tool_id = _hls_tool_identity()
+        except OSError:
+            self.tool_id = ""
         self.processes = {}
         self.start_times = {}
-        self.log_files = {}
+        self.log_files = {}  # config_name -> raw fd the child writes its log to
+        self.tails = {}  # config_name -> TailState of its log
+        self.cache_keys = {}  # config_name -> (pattern, optimization, hash)
+        self.dep_mtimes = {}  # config_name -> dependency mtimes at launch
         self.configurations = []  # List of (pattern, optimization) tuples
+        self.fresh_configs = set()  # Configs really run (not restored) this time
+        self.succeeded = set()  # Configs whose process exited with code 0
+        self._lock = threading.Lock()  # Guards state mutated by launch threads
+        # Cache archiving can take minutes for large cosim projects, so it
+        # runs off the monitor thread
+        self._archiver = ThreadPoolExecutor(max_workers=1)
+        self._archives = []
         
-    def launch_pattern(self, pattern, optimization=""):
-        """Launch HLS flow for a specific pattern and optimization level"""
+    def launch_pattern(self, pattern, optimization="", config_hash=None,
+                       dep_mtimes=None, slot=None, num_slots=1):
+        """Launch HLS flow for a specific pattern and optimization level
+        
+        `config_hash` and `dep_mtimes` are computed here unless the caller
+        already has them. With affinity enabled, `slot` (the pattern's index out of
+        `num_slots`) selects the CPU subset the process is pinned to.
+        """
         
         # Create config identifier
         config_name = f"{pattern}{optimization}"
@@ -53,40 +310,87 @@ class HLSRunner:
         log_file = WORKING_DIR / f"hls_{pattern}{optimization}.log"
         
         opt_label = "AGGRESSIVE" if optimization else "STANDARD"
-        print(f"[{self._timestamp()}] Launching {pattern} ({opt_label}) flow...")
-        print(f"  Script: {script_name}")
-        print(f"  Log: {log_file}")
+        # Launches run concurrently, so buffer this config's report and
+        # print it in one block
+        report = [f"[{self._timestamp()}] Launching {pattern} ({opt_label}) flow...",
+                  f"  Script: {script_name}",
+                  f"  Log: {log_file}"]
         
-        # Open log file
-        log_handle = open(log_file, 'w')
-        self.log_files[config_name] = log_handle
+        if config_hash is None:
+            try:
+                deps = _config_deps(pattern, optimization)
+                dep_mtimes = _dep_mtimes(deps)
+                config_hash = _config_hash(deps, self.stage, self.tool_id)
+            except OSError as e:
+                report.append(f"  ✗ Error hashing configuration: {e}")
+                self._print_report(report)
+                return False
         
-        # Launch process
-        try:
-            process = subprocess.Popen(
-                [HLS_COMMAND, "-f", script_name],
-                cwd=WORKING_DIR,
-                stdout=log_handle,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
+        if self._restore_cached(pattern, optimization, config_hash):
+            report.append(f"  ✓ Restored from cache ({config_hash[:12]})")
+            # Dummy process so the monitor reports it as completed
+            log_fd = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC, 0o644)
+            process = subprocess.Popen(["true"], stdout=log_fd)
+            fresh = False
+        else:
+            # Open log file unbuffered; the child writes straight to the fd
+            log_fd = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+            
+            fresh = True
+            
+            # The testbench appends, so start each run with a fresh CSV
+            results_csv = _results_csv(pattern, optimization)
+            results_csv.unlink(missing_ok=True)
             
+            # Launch process
+            try:
+                process = subprocess.Popen(
+                    self._priority_prefix(optimization)
+                    + [HLS_COMMAND, "-f", script_name, "-tclargs", self.stage],
+                    cwd=WORKING_DIR,
+                    env={**os.environ, "SW_QPS_RESULTS_CSV": str(results_csv)},
+                    stdout=log_fd,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True  # Ctrl+C here must not reach vitis_hls
+                )
+                report.append(f"  ✓ Started (PID: {process.pid})")
+                cpus = self._cpu_subset(slot, num_slots) if self.affinity and slot is not None else None
+                if cpus:
+                    try:
+                        os.sched_setaffinity(process.pid, cpus)
+                        report.append(f"  ✓ Pinned to CPUs {self._format_cpus(cpus)}")
+                    except OSError as e:
+                        report.append(f"  ⚠ Could not set CPU affinity: {e}")
+                
+            except FileNotFoundError:
+                report.append(f"  ✗ Error: {HLS_COMMAND} not found!")
+                report.append(f"    Make sure Vitis HLS is installed and in PATH")
+                self._print_report(report)
+                os.close(log_fd)
+                return False
+            except Exception as e:
+                report.append(f"  ✗ Error launching: {e}")
+                self._print_report(report)
+                os.close(log_fd)
+                return False
+        
+        with self._lock:
+            self.cache_keys[config_name] = (pattern, optimization, config_hash)
+            self.dep_mtimes[config_name] = dep_mtimes
+            self.log_files[config_name] = log_fd
+            self.tails[config_name] = TailState(log_file)
             self.processes[config_name] = process
             self.start_times[config_name] = time.time()
             self.configurations.append((pattern, optimization))
-            
-            print(f"  ✓ Started (PID: {process.pid})")
-            return True
-            
-        except FileNotFoundError:
-            print(f"  ✗ Error: {HLS_COMMAND} not found!")
-            print(f"    Make sure Vitis HLS is installed and in PATH")
-            log_handle.close()
-            return False
-        except Exception as e:
-            print(f"  ✗ Error launching: {e}")
-            log_handle.close()
-            return False
+            if fresh:
+                self.fresh_configs.add((pattern, optimization))
+        self._print_report(report)
+        return True
+    
+    def _print_report(self, lines):
+        """Print a block of launch output without interleaving"""
+        with self._lock:
+            print("\n".join(lines))
     
     def launch_all(self):
         """Launch all pattern flows"""
@@ -99,26 +403,145 @@ class HLSRunner:
         print(f"Launching {total_configs} parallel HLS flows...")
         print(f"  Patterns: {', '.join(PATTERNS)}")
         print(f"  Optimizations: Standard, Aggressive")
+        print(f"  Stage: {self.stage}")
         print()
         
+        # Scan each config's deps and hash its sources once; configs that
+        # fail here are left to launch_pattern to retry and report
+        configs = []
+        keys = {}  # (pattern, optimization) -> (hash, dep mtimes)
+        for pattern, optimization in itertools.product(PATTERNS, OPTIMIZATIONS):
+            try:
+                deps = _config_deps(pattern, optimization)
+                dep_mtimes = _dep_mtimes(deps)
+            except OSError:
+                configs.append((pattern, optimization))
+                continue
+            if self._is_up_to_date(pattern, optimization, dep_mtimes):
+                print(f"[{self._timestamp()}] ⏭ {pattern}{optimization} unchanged since last run, skipping")
+                continue
+            configs.append((pattern, optimization))
+            try:
+                keys[pattern, optimization] = (_config_hash(deps, self.stage, self.tool_id),
+                                               dep_mtimes)
+            except OSError:
+                pass
+        skipped_count = total_configs - len(configs)
+        
+        # Every launch rewrites its project directory, so a config stays
+        # "up to date" only if this run succeeds and re-records it
+        if any(f"{p}{o}" in self.depcache for p, o in configs):
+            for pattern, optimization in configs:
+                self.depcache.pop(f"{pattern}{optimization}", None)
+            self._save_depcache()
+        
+        # CPU slots go only to configs that will really run vitis_hls;
+        # cache hits just restore files. Both variants of a pattern share a
+        # slot, otherwise nice has no competitor to yield to
+        fresh = [c for c in configs
+                 if c not in keys or not self._has_cache_entry(keys[c][0])]
+        fresh_patterns = list(dict.fromkeys(pattern for pattern, _ in fresh))
+        slots = {config: fresh_patterns.index(config[0]) for config in fresh}
+        
+        # Popen returns immediately and vitis_hls startup staggers itself,
+        # so create all processes at once
         success_count = 0
-        for optimization in OPTIMIZATIONS:
-            for pattern in PATTERNS:
-                if self.launch_pattern(pattern, optimization):
-                    success_count += 1
-                time.sleep(0.5)  # Stagger launches slightly
+        if configs:
+            with ThreadPoolExecutor(max_workers=len(configs)) as pool:
+                results = pool.map(
+                    lambda c: self.launch_pattern(*c, *keys.get(c, (None, None)),
+                                                  slot=slots.get(c),
+                                                  num_slots=len(fresh_patterns)),
+                    configs)
+                success_count = sum(results)
         
         print()
-        if success_count == 0:
+        if success_count == 0 and skipped_count == 0:
             print("✗ Failed to launch any processes!")
             return False
-        elif success_count < total_configs:
-            print(f"⚠ Warning: Only {success_count}/{total_configs} processes launched")
-        else:
+        elif success_count < len(configs):
+            print(f"⚠ Warning: Only {success_count}/{len(configs)} processes launched")
+        elif configs:
             print(f"✓ All {success_count} processes launched successfully")
+        if skipped_count:
+            print(f"✓ {skipped_count} up-to-date configuration(s) skipped")
         
         print()
-        return success_count > 0
+        return True
+    
+    def _priority_prefix(self, optimization):
+        """Command prefix that de-prioritizes non-critical variants
+        
+        Standard runs are assumed to be the interactive feedback path, so
+        aggressive variants run at nice 10 and, where ionice exists, in the
+        idle I/O class. Niceness only matters between processes on the same
+        CPUs, which is why _cpu_subset slots are per pattern. A command
+        prefix is used instead of preexec_fn because launches happen from
+        worker threads.
+        """
+        if not optimization:
+            return []
+        prefix = []
+        if shutil.which("ionice"):
+            prefix += ["ionice", "-c3"]
+        if shutil.which("nice"):
+            prefix += ["nice", "-n", str(AGGRESSIVE_NICENESS)]
+        return prefix
+    
+    def _cpu_subset(self, slot, num_slots):
+        """CPUs for pattern `slot`: a disjoint share of the usable CPUs
+        
+        Shares differ by at most one CPU; the first `len % num_slots` slots
+        take the remainder so no CPU is left idle. Returns None when there
+        are fewer CPUs than slots, since sharing single cores is better
+        left to the scheduler.
+        """
+        available = sorted(os.sched_getaffinity(0))
+        per, extra = divmod(len(available), num_slots)
+        if per == 0:
+            return None
+        start = slot * per + min(slot, extra)
+        end = start + per + (1 if slot < extra else 0)
+        return set(available[start:end])
+    
+    def _has_cache_entry(self, config_hash):
+        """True if a complete cache entry exists for a config hash"""
+        return (CACHE_DIR / config_hash / "DONE").exists()
+    
+    def _format_cpus(self, cpus):
+        """Render a CPU set compactly, e.g. 0-3 or 5"""
+        cpus = sorted(cpus)
+        if cpus == list(range(cpus[0], cpus[-1] + 1)) and len(cpus) > 1:
+            return f"{cpus[0]}-{cpus[-1]}"
+        return ",".join(map(str, cpus))
+    
+    def _is_up_to_date(self, pattern, optimization, dep_mtimes):
+        """True if a config's deps (`dep_mtimes`, from _dep_mtimes) are
+        unchanged since its last successful run"""
+        config_name = f"{pattern}{optimization}"
+        entry = self.depcache.get(config_name)
+        if entry is None or entry.get("stage") != self.stage:
+            return False
+        if not (WORKING_DIR / f"sw_qps_project_{config_name}").is_dir():
+            return False
+        return entry.get("deps") == dep_mtimes
+    
+    def _record_deps(self, config_name):
+        """Remember a successful config's dependency mtimes in DEPCACHE_FILE"""
+        self.depcache[config_name] = {"stage": self.stage,
+                                      "deps": self.dep_mtimes[config_name]}
+        self._save_depcache()
+    
+    def _save_depcache(self):
+        """Atomically write self.depcache to DEPCACHE_FILE"""
+        try:
+            CACHE_DIR.mkdir(exist_ok=True)
+            tmp_file = DEPCACHE_FILE.with_suffix(".tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(self.depcache, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, DEPCACHE_FILE)
+        except OSError as e:
+            print(f"[{self._timestamp()}] ⚠ Could not update {DEPCACHE_FILE.name}: {e}")
     
     def monitor(self):
         """Monitor running processes"""
@@ -128,46 +551,59 @@ class HLSRunner:
         print("Press Ctrl+C to stop monitoring (processes will continue)")
         print()
         
+        # One waiter thread per process blocks in wait() and reports the
+        # exit code, so completions are seen as soon as they happen
+        completions = queue.Queue()
+        for pattern, process in self.processes.items():
+            threading.Thread(
+                target=lambda p=pattern, proc=process: completions.put((p, proc.wait())),
+                daemon=True
+            ).start()
+        
         try:
             while self.processes:
-                # Check each process
-                completed = []
-                
-                for pattern, process in self.processes.items():
-                    returncode = process.poll()
-                    
-                    if returncode is not None:
-                        # Process completed
-                        elapsed = time.time() - self.start_times[pattern]
-                        elapsed_str = self._format_duration(elapsed)
-                        
-                        if returncode == 0:
-                            print(f"[{self._timestamp()}] ✓ {pattern:20s} COMPLETED ({elapsed_str})")
-                        else:
-                            print(f"[{self._timestamp()}] ✗ {pattern:20s} FAILED (exit code: {returncode}, {elapsed_str})")
-                        
-                        completed.append(pattern)
-                
-                # Remove completed processes
-                for pattern in completed:
-                    del self.processes[pattern]
-                    self.log_files[pattern].close()
-                
-                if self.processes:
+                try:
+                    pattern, returncode = completions.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
                     # Still running - show status
                     running = list(self.processes.keys())
                     elapsed_times = [time.time() - self.start_times[p] for p in running]
                     max_elapsed = max(elapsed_times)
                     
+                    for p in running:
+                        self._report_errors(p, self.tails[p].update())
+                    
                     print(f"[{self._timestamp()}] Running: {', '.join(running)} "
                           f"(longest: {self._format_duration(max_elapsed)})", end='\r')
-                    
-                    time.sleep(10)  # Check every 10 seconds
+                    continue
+                
+                # Process completed
+                elapsed = time.time() - self.start_times[pattern]
+                elapsed_str = self._format_duration(elapsed)
+                
+                del self.processes[pattern]
+                self._report_errors(pattern, self.tails[pattern].close())
+                self._close_log(pattern)
+                
+                if returncode == 0:
+                    print(f"[{self._timestamp()}] ✓ {pattern:20s} COMPLETED ({elapsed_str})")
+                    self.succeeded.add(self.cache_keys[pattern][:2])
+                    self._archives.append(self._archiver.submit(self._store_cached, pattern))
+                    self._record_deps(pattern)
                 else:
-                    print("\n")
-                    break
+                    print(f"[{self._timestamp()}] ✗ {pattern:20s} FAILED (exit code: {returncode}, {elapsed_str})")
+            
+            print("\n")
+            
+            pending = sum(not f.done() for f in self._archives)
+            if pending:
+                print(f"[{self._timestamp()}] Waiting for {pending} cache archive(s)...")
+            self._archiver.shutdown(wait=True)
+            self._prune_cache()
                     
         except KeyboardInterrupt:
+            # Let an in-progress archive finish (at exit) but drop queued ones
+            self._archiver.shutdown(wait=False, cancel_futures=True)
             print("\n\n⚠ Monitoring interrupted by user")
             print(f"  {len(self.processes)} process(es) still running in background:")
             for pattern, process in self.processes.items():
@@ -180,54 +616,245 @@ class HLSRunner:
         print("EXECUTION SUMMARY")
         print("=" * 70)
         
+        # One directory read per category instead of a stat per file
+        logs = {p.name: p for p in WORKING_DIR.glob("hls_*.log")}
+        csvs = {p.name for p in WORKING_DIR.glob("sw_qps_*_results.csv")}
+        projects = {p.name for p in WORKING_DIR.glob("sw_qps_project_*")}
+        
         # List all log files
         print("\nLog files:")
         for optimization in OPTIMIZATIONS:
             for pattern in PATTERNS:
                 config_name = f"{pattern}{optimization}"
-                log_file = WORKING_DIR / f"hls_{config_name}.log"
-                if log_file.exists():
-                    size = log_file.stat().st_size / 1024  # KB
-                    print(f"  - {log_file.name:40s} ({size:8.1f} KB)")
+                log_name = f"hls_{config_name}.log"
+                tail = self.tails.get(config_name)
+                if tail is not None:
+                    size = tail.pos / 1024  # KB
+                    m = tail.metrics
+                    print(f"  - {log_name:40s} ({size:8.1f} KB)  "
+                          f"errors: {m['errors']}, warnings: {m['warnings']}, "
+                          f"last reported II: {m['last_ii'] or '-'}, "
+                          f"latency: {m['last_latency'] or '-'}")
+                elif log_name in logs:
+                    size = logs[log_name].stat().st_size / 1024  # KB
+                    print(f"  - {log_name:40s} ({size:8.1f} KB)")
         
-        # List results CSV files
-        print("\nResults files:")
-        for pattern in PATTERNS:
-            csv_file = WORKING_DIR / f"sw_qps_{pattern}_results.csv"
-            if csv_file.exists():
-                print(f"  ✓ {csv_file.name}")
-            else:
-                print(f"  ✗ {csv_file.name} (not found)")
+        # List results CSV files (only stages that run the testbench write them)
+        if self.stage in CSV_STAGES:
+            print("\nResults files:")
+            for optimization in OPTIMIZATIONS:
+                for pattern in PATTERNS:
+                    if (pattern, optimization) not in self.fresh_configs & self.succeeded:
+                        continue
+                    csv_name = _results_csv(pattern, optimization).name
+                    if csv_name in csvs:
+                        print(f"  ✓ {csv_name}")
+                    else:
+                        print(f"  ✗ {csv_name} (not found)")
+        
+            row_count, archive_dir = self._aggregate_results()
+            if row_count:
+                print(f"  → {row_count} row(s) appended to {RESULTS_FILE.name} "
+                      f"(originals moved to {archive_dir.relative_to(WORKING_DIR)}/)")
         
         # List project directories
         print("\nProject directories:")
         for optimization in OPTIMIZATIONS:
             opt_suffix = "_aggressive" if optimization else ""
             for pattern in PATTERNS:
-                proj_dir = WORKING_DIR / f"sw_qps_project_{pattern}{opt_suffix}"
-                if proj_dir.exists():
-                    print(f"  ✓ {proj_dir.name}/")
+                proj_name = f"sw_qps_project_{pattern}{opt_suffix}"
+                if proj_name in projects:
+                    print(f"  ✓ {proj_name}/")
                 else:
-                    print(f"  ✗ {proj_dir.name}/ (not found)")
+                    print(f"  ✗ {proj_name}/ (not found)")
         
         print("\n" + "=" * 70)
         print("DONE")
         print("=" * 70)
     
+    def _close_log(self, config_name):
+        """Close a finished config's log fd"""
+        os.close(self.log_files.pop(config_name))
+    
+    def _report_errors(self, config_name, errors):
+        """Print ERROR lines picked up from a log as soon as they appear"""
+        for line in errors:
+            print(f"[{self._timestamp()}] ✗ {config_name}: {line}")
+    
+    def _aggregate_results(self):
+        """Append this run's per-config CSVs to RESULTS_FILE
+        
+        Only configs that really ran and succeeded are aggregated;
+        cache-restored ones were aggregated when they originally ran. Rows are tagged with their
+        config's optimization level and the source files are moved to a new
+        timestamped subdirectory of RESULTS_ARCHIVE_DIR.
+        Returns (row count, archive subdirectory).
+        """
+        header = None
+        rows = []
+        sources = []
+        for optimization in OPTIMIZATIONS:
+            for pattern in PATTERNS:
+                csv_file = _results_csv(pattern, optimization)
+                # Failed or still-running (after Ctrl+C) flows are left alone
+                if ((pattern, optimization) in self.fresh_configs & self.succeeded
+                        and csv_file.exists()):
+                    sources.append((optimization, csv_file))
+        
+        aggregated = []
+        for optimization, csv_file in sources:
+            with open(csv_file, newline='') as f:
+                reader = csv.reader(f)
+                file_header = next(reader, None)
+                if file_header is None:
+                    continue
+                if header is None:
+                    header = file_header
+                elif file_header != header:
+                    print(f"  ⚠ {csv_file.name} has a different header, not aggregated")
+                    continue
+                variant = "aggressive" if optimization else "standard"
+                rows.extend([variant] + row for row in reader if row)
+            aggregated.append(csv_file)
+        
+        if not aggregated:
+            return 0, None
+        
+        write_header = not RESULTS_FILE.exists() or RESULTS_FILE.stat().st_size == 0
+        with open(RESULTS_FILE, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(["optimization"] + header)
+            writer.writerows(rows)
+        
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        archive_dir = RESULTS_ARCHIVE_DIR / stamp
+        suffix = 1
+        while archive_dir.exists():
+            suffix += 1
+            archive_dir = RESULTS_ARCHIVE_DIR / f"{stamp}-{suffix}"
+        archive_dir.mkdir(parents=True)
+        for csv_file in aggregated:
+            os.replace(csv_file, archive_dir / csv_file.name)
+        return len(rows), archive_dir
+    
+    def _restore_cached(self, pattern, optimization, config_hash):
+        """Restore outputs of a previous identical run; return True on hit"""
+        entry = CACHE_DIR / config_hash
+        if not (entry / "DONE").exists():
+            return False
+        
+        proj_dir, log_file = _cache_outputs(pattern, optimization)
+        try:
+            if proj_dir.exists():
+                shutil.rmtree(proj_dir)
+            shutil.unpack_archive(str(entry / "project.tar.gz"), WORKING_DIR)
+            if (entry / log_file.name).exists():
+                shutil.copy2(entry / log_file.name, log_file)
+            os.utime(entry / "DONE")  # Mark as recently used for eviction
+        except (OSError, shutil.ReadError) as e:
+            print(f"  ⚠ Cache entry {config_hash[:12]} unusable ({e}), rerunning")
+            return False
+        return True
+    
+    def _prune_cache(self):
+        """Drop incomplete entries, then evict LRU entries over CACHE_MAX_BYTES"""
+        if not CACHE_DIR.is_dir():
+            return
+        entries = []
+        for entry in CACHE_DIR.iterdir():
+            if not entry.is_dir():
+                continue
+            if not (entry / "DONE").exists():
+                # Left behind by an interrupted archive
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append(((entry / "DONE").stat().st_mtime, size, entry))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= CACHE_MAX_BYTES:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            print(f"[{self._timestamp()}] Evicted cache entry {entry.name[:12]} "
+                  f"({size / 1024**2:.1f} MB)")
+    
+    def _store_cached(self, config_name):
+        """Archive outputs of a successful run under its config hash"""
+        pattern, optimization, config_hash = self.cache_keys[config_name]
+        entry = CACHE_DIR / config_hash
+        if (entry / "DONE").exists():
+            return
+        
+        proj_dir, log_file = _cache_outputs(pattern, optimization)
+        if not proj_dir.exists():
+            return
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            shutil.make_archive(str(entry / "project"), "gztar",
+                                root_dir=WORKING_DIR, base_dir=proj_dir.name)
+            if log_file.exists():
+                shutil.copy2(log_file, entry / log_file.name)
+                # Tailing and archiving were the last readers of the log
+                _drop_page_cache(log_file)
+            (entry / "DONE").touch()
+        except OSError as e:
+            print(f"[{self._timestamp()}] ⚠ Could not cache {config_name}: {e}")
+    
     def _timestamp(self):
         """Get formatted timestamp"""
-        return datetime.now().strftime("%H:%M:%S")
+        return time.strftime("%H:%M:%S")
     
     def _format_duration(self, seconds):
         """Format duration in human-readable format"""
         if seconds < 60:
-            return f"{seconds:.0f}s"
+            return f"{int(seconds)}s"
         elif seconds < 3600:
-            mins = seconds / 60
-            return f"{mins:.1f}m"
+            return f"{seconds / 60:.1f}m"
         else:
-            hours = seconds / 3600
-            return f"{hours:.1f}h"
+            return f"{seconds / 3600:.1f}h"
+
+
+def _hls_tool_works(cmd, path):
+    """Run `<cmd> -version` until it succeeds once per binary
+    
+    Successful probes are recorded in ENV_CACHE_FILE, keyed on the resolved
+    binary's inode and mtime, so reinstalling or switching tool versions
+    triggers a fresh probe. Failures are never cached: they are usually an
+    environment problem (e.g. settings64.sh not sourced yet) that gets fixed
+    without touching the binary.
+    """
+    st = os.stat(path)
+    key = {"path": path, "ino": st.st_ino, "mtime_ns": st.st_mtime_ns}
+    
+    try:
+        with open(ENV_CACHE_FILE) as f:
+            env_cache = json.load(f)
+    except (OSError, ValueError):
+        env_cache = {}
+    entry = env_cache.get(cmd)
+    if entry is not None and entry.get("key") == key:
+        return True
+    
+    try:
+        result = subprocess.run([path, "-version"],
+                               capture_output=True,
+                               timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    if result.returncode != 0:
+        return False
+    
+    env_cache[cmd] = {"key": key}
+    try:
+        ENV_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(ENV_CACHE_FILE, "w") as f:
+            json.dump(env_cache, f, indent=2)
+    except OSError:
+        pass  # Caching is best effort
+    return True
 
 
 def check_environment():
@@ -237,16 +864,13 @@ def check_environment():
     # Check for vitis_hls or vivado_hls
     hls_found = False
     for cmd in ["vitis_hls", "vivado_hls"]:
-        try:
-            result = subprocess.run([cmd, "-version"], 
-                                   capture_output=True, 
-                                   timeout=5)
-            if result.returncode == 0:
-                print(f"✓ Found {cmd}")
-                hls_found = True
-                break
-        except (FileNotFoundError, subprocess.TimeoutExpired):
+        path = shutil.which(cmd)
+        if path is None:
             continue
+        if _hls_tool_works(cmd, path):
+            print(f"✓ Found {cmd}")
+            hls_found = True
+            break
     
     if not hls_found:
         print("✗ Error: No HLS tool found (vitis_hls or vivado_hls)")
@@ -256,12 +880,15 @@ def check_environment():
     
     # Check for required TCL scripts
     print("\nChecking TCL scripts...")
+    # One directory read instead of a stat per script
+    with os.scandir(WORKING_DIR) as it:
+        present = {e.name for e in it}
     all_found = True
     for optimization in OPTIMIZATIONS:
         for pattern in PATTERNS:
             config_name = f"{pattern}{optimization}"
             script = WORKING_DIR / f"run_sw_qps_{config_name}.tcl"
-            if script.exists():
+            if script.name in present:
                 print(f"✓ {script.name}")
             else:
                 print(f"✗ {script.name} not found!")
@@ -276,6 +903,12 @@ def check_environment():
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Run all SW-QPS HLS flows in parallel")
+    parser.add_argument("--stage", choices=STAGES, default=DEFAULT_STAGE,
+                        help=f"flow stage passed to the TCL scripts (default: {DEFAULT_STAGE})")
+    parser.add_argument("--no-affinity", action="store_true",
+                        help="do not pin each pattern's HLS processes to a CPU subset")
+    args = parser.parse_args()
     
     # Check environment
     if not check_environment():
@@ -284,7 +917,7 @@ def main():
         sys.exit(1)
     
     # Create runner and launch
-    runner = HLSRunner()
+    runner = HLSRunner(stage=args.stage, affinity=not args.no_affinity)
     
     if not runner.launch_all():
         print("\n✗ Failed to launch HLS flows!")
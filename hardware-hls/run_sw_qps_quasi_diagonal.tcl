@@ -30,6 +30,20 @@ set_part xczu9eg-ffvb1156-2-e
 # Set clock period (5ns = 200 MHz)
 create_clock -period 5 -name default
 
+# Flow stage, selected with `vitis_hls -f <script> -tclargs <stage>`:
+#   csyn  - synthesis only
+#   cosim - synthesis + co-simulation (default)
+#   impl  - synthesis + implementation
+#   all   - C simulation + synthesis + co-simulation + implementation
+set hls_stage [expr {$argc > 0 ? [lindex $argv 0] : "cosim"}]
+
+if {$hls_stage eq "all"} {
+    puts "========================================="
+    puts "Step 1: Running C Simulation - QUASI-DIAGONAL..."
+    puts "========================================="
+    csim_design -clean
+}
+
 # ============================================================================
 # Step 2: Synthesis
 # ============================================================================
@@ -48,12 +62,25 @@ csynth_design
 # ============================================================================
 # Step 3: Co-Simulation
 # ============================================================================
-puts "========================================="
-puts "Step 3: Running Co-Simulation - QUASI-DIAGONAL..."
-puts "========================================="
+if {$hls_stage in {cosim all}} {
+    puts "========================================="
+    puts "Step 3: Running Co-Simulation - QUASI-DIAGONAL..."
+    puts "========================================="
+
+    # Faster option: Run with reduced test set
+    cosim_design -O -trace_level all
+}
+
+# ============================================================================
+# Step 4: Implementation
+# ============================================================================
+if {$hls_stage in {impl all}} {
+    puts "========================================="
+    puts "Step 4: Running Implementation - QUASI-DIAGONAL..."
+    puts "========================================="
 
-# Faster option: Run with reduced test set
-cosim_design -O -trace_level all
+    export_design -flow impl
+}
 
 puts "========================================="
 puts "QUASI-DIAGONAL Traffic Flow Complete!"
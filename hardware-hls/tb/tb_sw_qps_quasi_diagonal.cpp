@@ -14,10 +14,21 @@
 #include <random>
 #include <cmath>
 #include <cassert>
+#include <cstdlib>
 #include "../src/sw_qps_top.h"
 
 using namespace std;
 
+// Results CSV path. run_parallel_hls.py sets SW_QPS_RESULTS_CSV to a
+// per-configuration file so standard and aggressive runs stay separate.
+// Every testbench execution of a flow (csim, both cosim passes) writes the
+// same absolute path, so in that mode each process truncates it on its
+// first write and the file holds the last execution's rows only.
+static string resultsFile() {
+    const char* path = getenv("SW_QPS_RESULTS_CSV");
+    return path ? path : "sw_qps_quasi_diagonal_results.csv";
+}
+
 // Performance metrics collector
 class PerformanceMonitor {
 public:
@@ -97,7 +108,9 @@ public:
     }
     
     void saveToCSV(const string& filename, double load, const string& pattern) {
-        ofstream file(filename, ios::app);
+        static bool truncate = getenv("SW_QPS_RESULTS_CSV") != nullptr;
+        ofstream file(filename, truncate ? ios::trunc : ios::app);
+        truncate = false;
         if (file.is_open()) {
             // Write header if file is empty
             file.seekp(0, ios::end);
@@ -244,7 +257,7 @@ void testSWQPS(
     monitor.printSummary(offered_load, pattern);
     
     // Save to CSV
-    monitor.saveToCSV("sw_qps_quasi_diagonal_results.csv", offered_load, pattern);
+    monitor.saveToCSV(resultsFile(), offered_load, pattern);
 }
 
 int main() {
@@ -272,7 +285,7 @@ int main() {
     
     cout << "\n========================================" << endl;
     cout << "QUASI-DIAGONAL TRAFFIC TESTS COMPLETED!" << endl;
-    cout << "Results saved to: sw_qps_quasi_diagonal_results.csv" << endl;
+    cout << "Results saved to: " << resultsFile() << endl;
     cout << "========================================" << endl;
     
     return 0;